@@ -3,9 +3,13 @@
 MCP Agent - 규칙 기반 자동 방어 시스템
 - Suricata eve.json 필드 호환 파싱 (src_ip, alert.signature, alert.severity 등)
 - agent_config.json 로드/병합 지원
+- 대량 알림 백테스트: prepare_batch()로 한 번 변환 후 NumPy로 반복 평가 (numpy 선택 의존성)
 """
 
 import json
+import os
+import socket
+import sys
 import time
 from collections import defaultdict
 from datetime import datetime, timedelta, timezone
@@ -13,11 +17,52 @@ from pathlib import Path
 from subprocess import Popen, PIPE
 import threading
 
+# 프로젝트 루트의 공용 모듈 (memory_budget.py)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from memory_budget import MemoryBudget, approx_size, parse_size
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_US = timedelta(microseconds=1)
+# 타임스탬프가 없거나 해석 불가한 행 (어떤 시간 창에도 포함되지 않음)
+_NO_TIME = -(2 ** 63)
+
+
+class AlertBatch:
+    """알림 목록을 한 번만 배열로 변환해 둔 것 (detect_threats 배치 경로/백테스트용)
+
+    행마다 Python 처리가 필요한 부분(타임스탬프 파싱, 필드 추출, 문자열 → 코드)은 여기서 끝내고,
+    시간 창/화이트리스트/가중치/임계값은 평가 시점에 벡터 연산으로 적용
+    → 같은 배치를 설정만 바꿔 반복 평가할 때 변환 비용이 다시 들지 않음
+    """
+
+    def __init__(self, agent, alerts):
+        import numpy as np  # 선택 의존성
+
+        n = len(alerts)
+        self.alerts = alerts
+        self.epoch_us = np.fromiter((agent._epoch_us(a.get('timestamp')) for a in alerts),
+                                    dtype=np.int64, count=n)
+        # 문자열 → 정수 코드 (첫 등장 순서)
+        ip_index = {}
+        self.ip_codes = np.fromiter((ip_index.setdefault(ip, len(ip_index)) for ip in map(agent._extract_ip, alerts)),
+                                    dtype=np.int64, count=n)
+        self.ips = list(ip_index)
+        sig_index = {}
+        self.sig_codes = np.fromiter((sig_index.setdefault(s, len(sig_index)) for s in map(agent._extract_signature, alerts)),
+                                     dtype=np.int64, count=n)
+        self.signatures = list(sig_index)
+        severities = np.fromiter(map(agent._extract_severity, alerts), dtype=np.int64, count=n)
+        self.severity_values, sev_codes = np.unique(severities, return_inverse=True)
+        self.severity_codes = sev_codes.reshape(-1)
+
+    def __len__(self):
+        return len(self.alerts)
+
 
 class SimpleMCPClient:
     """간단한 MCP 클라이언트 (동기 버전)"""
 
-    def __init__(self, server_script=None):
+    def __init__(self, server_script=None, socket_path=None):
         # 프로젝트 루트(…/One-Step-Client-Dashboard-main)
         self.root = Path(__file__).resolve().parents[1]
 
@@ -29,12 +74,33 @@ class SimpleMCPClient:
             candidate = candidate if candidate.is_absolute() else (self.root / candidate)
 
         self.server_script = str(candidate.resolve())
+        # 데몬 모드 서버의 Unix socket (없으면 자식 프로세스 방식)
+        self.socket_path = socket_path or os.environ.get('MCP_SOCKET')
         self.process = None
+        self.sock = None
+        self._rfile = None
+        self._wfile = None
         self.request_id = 0
         self.pending = {}
 
     def connect(self):
-        """MCP 서버 연결(에이전트가 자식 프로세스로 서버를 띄움)"""
+        """MCP 서버 연결(데몬 socket 우선, 없으면 에이전트가 자식 프로세스로 서버를 띄움)"""
+        if self.socket_path and Path(self.socket_path).exists():
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.socket_path)
+            except (ConnectionRefusedError, FileNotFoundError) as e:
+                # 데몬이 SIGKILL/OOM으로 죽으면 소켓 파일만 남음 → 자식 프로세스 방식으로 대체
+                sock.close()
+                print(f'⚠️  MCP socket {self.socket_path} unavailable ({e.__class__.__name__}), starting own server')
+            else:
+                self.sock = sock
+                self._rfile = self.sock.makefile('r', encoding='utf-8')
+                self._wfile = self.sock.makefile('w', encoding='utf-8')
+                self._start()
+                print(f'✅ MCP Agent connected to server (socket: {self.socket_path})')
+                return
+
         server_path = Path(self.server_script)
         if not server_path.exists():
             raise FileNotFoundError(
@@ -44,15 +110,24 @@ class SimpleMCPClient:
                 f"※ 프로젝트 루트에서 실행하거나, server_script 경로를 확인하세요."
             )
 
+        # 자식 서버는 stdio 전용 (MCP_SOCKET을 물려받으면 소켓 데몬 모드로 떠 버림)
+        env = {k: v for k, v in os.environ.items() if k != 'MCP_SOCKET'}
         self.process = Popen(
             ['python3', self.server_script],
             stdin=PIPE,
             stdout=PIPE,
             stderr=PIPE,
             text=True,
-            bufsize=1
+            bufsize=1,
+            env=env
         )
+        self._rfile = self.process.stdout
+        self._wfile = self.process.stdin
+        self._start()
+        print(f'✅ MCP Agent connected to server ({server_path})')
 
+    def _start(self):
+        """응답 읽기 스레드 시작 + initialize 핸드셰이크"""
         # 응답 읽기 스레드
         threading.Thread(target=self._read_responses, daemon=True).start()
 
@@ -64,12 +139,11 @@ class SimpleMCPClient:
         })
         if init_res is None:
             raise RuntimeError("[MCP] 서버 초기화 응답이 없습니다. 서버가 즉시 종료되었을 수 있습니다.")
-
-        print(f'✅ MCP Agent connected to server ({server_path})')
+        self._send_notification('notifications/initialized')
 
     def _read_responses(self):
         """서버 stdout에서 JSON-RPC 응답 읽기"""
-        for line in self.process.stdout:
+        for line in self._rfile:
             s = line.strip()
             if not s:
                 continue
@@ -92,9 +166,9 @@ class SimpleMCPClient:
         self.pending[req_id] = None
 
         try:
-            self.process.stdin.write(json.dumps(req) + '\n')
-            self.process.stdin.flush()
-        except BrokenPipeError:
+            self._wfile.write(json.dumps(req) + '\n')
+            self._wfile.flush()
+        except (BrokenPipeError, ConnectionError):
             return {'error': {'message': 'Broken pipe: server process is not accepting input'}}
 
         for _ in range(50):  # 5s
@@ -105,6 +179,15 @@ class SimpleMCPClient:
         self.pending.pop(req_id, None)
         return None
 
+    def _send_notification(self, method, params=None):
+        """응답이 없는 JSON-RPC 알림 전송"""
+        msg = {'jsonrpc': '2.0', 'method': method, 'params': params or {}}
+        try:
+            self._wfile.write(json.dumps(msg) + '\n')
+            self._wfile.flush()
+        except (BrokenPipeError, ConnectionError):
+            pass
+
     def get_recent_alerts(self, count=50):
         """최근 알림 조회 (서버가 alerts JSON 문자열을 content[0].text로 전달한다고 가정)"""
         result = self._send_request('tools/call', {
@@ -145,6 +228,12 @@ class SimpleMCPClient:
 
     def disconnect(self):
         """연결 종료"""
+        if self.sock:
+            try:
+                self.sock.close()
+            except Exception:
+                pass
+            self.sock = None
         if self.process:
             try:
                 self.process.stdin.close()
@@ -158,7 +247,8 @@ class SecurityAgent:
 
     def __init__(self):
         self.mcp = SimpleMCPClient()
-        self.blocked_ips = set()
+        # 차단한 IP → 차단 시각 (실제 방화벽 규칙과 일치해야 하므로 예산을 넘어도 제거하지 않고 경고만)
+        self.blocked_ips = {}
         self.alert_history = []
 
         # 디렉토리 구조 설정
@@ -174,7 +264,12 @@ class SecurityAgent:
             'time_window': 300,
             'severity_weight': {1: 10, 2: 5, 3: 2},
             'auto_block': True,
-            'whitelist': ['127.0.0.1', 'localhost']
+            'whitelist': ['127.0.0.1', 'localhost'],
+            'memory_budget': 0,
+            # 서버 enrichment 필드 기반 가산점 (IP당 1회)
+            'reputation_weight': 0,     # reputation(0~100) / 100 * weight
+            'country_weight': {},       # {"KP": 10, ...}
+            'asn_weight': {}            # {"12345": 5, ...}
         }
 
         # agent_config.json 로드/병합
@@ -188,13 +283,18 @@ class SecurityAgent:
                     user_cfg['severity_weight'] = {int(k): v for k, v in sw.items()}
                 # 필요한 키만 덮어쓰기
                 for k in ['check_interval', 'alert_threshold', 'time_window',
-                          'severity_weight', 'auto_block', 'whitelist']:
+                          'severity_weight', 'auto_block', 'whitelist', 'memory_budget',
+                          'reputation_weight', 'country_weight', 'asn_weight']:
                     if k in user_cfg:
                         self.config[k] = user_cfg[k]
                 print('🧩 Loaded agent_config.json')
             except Exception as e:
                 print(f'⚠️  agent_config.json 로드 실패: {e}')
 
+        # 에이전트 상태의 근사 메모리 예산 ("8M" 등, 0 = 무제한)
+        self.memory = MemoryBudget(parse_size(self.config['memory_budget']))
+        self._budget_warned = False
+
     # ---------- 파일/디렉토리 준비 ----------
     def _setup_directories(self):
         try:
@@ -218,6 +318,13 @@ class SecurityAgent:
         except Exception:
             return None
 
+    def _epoch_us(self, ts):
+        """타임스탬프 → epoch 마이크로초 (없거나 해석 불가 시 _NO_TIME)"""
+        t = self._parse_ts(ts) if ts else None
+        if not t:
+            return _NO_TIME
+        return (t - EPOCH) // _US
+
     def _extract_ip(self, alert: dict):
         """src_ip 우선, 서버가 가공해 보낸 source_ip도 지원"""
         return (
@@ -239,6 +346,25 @@ class SecurityAgent:
             return alert['signature']
         return alert.get('alert', {}).get('signature', 'Unknown')
 
+    def _extract_context(self, alert: dict):
+        """서버 enrichment 필드 (없으면 None)"""
+        return {
+            'country': alert.get('src_country'),
+            'asn': alert.get('src_asn'),
+            'reputation': alert.get('src_reputation'),
+        }
+
+    def _context_bonus(self, ctx: dict):
+        """국가/ASN/평판 가산점"""
+        bonus = 0
+        if ctx.get('reputation') and self.config['reputation_weight']:
+            bonus += self.config['reputation_weight'] * ctx['reputation'] / 100
+        if ctx.get('country'):
+            bonus += self.config['country_weight'].get(ctx['country'], 0)
+        if ctx.get('asn') is not None:
+            bonus += self.config['asn_weight'].get(str(ctx['asn']), 0)
+        return bonus
+
     # ---------- 메인 루프 ----------
     def start(self):
         print('🤖 MCP Security Agent Starting...')
@@ -275,16 +401,25 @@ class SecurityAgent:
         else:
             print('   ✅ No threats detected')
 
-    def detect_threats(self, alerts):
+    def detect_threats(self, alerts, now=None):
+        """IP별 집계 → 위협 목록
+
+        alerts: 알림 dict 목록 또는 prepare_batch()로 만든 AlertBatch
+        now: 기준 시각 (백테스트 시 지정, timezone-aware)
+        """
+        now = now or datetime.now(timezone.utc)
+        if isinstance(alerts, AlertBatch):
+            return self._detect_threats_batch(alerts, now)
+
         threats = []
-        now = datetime.now(timezone.utc)
         window_start = now - timedelta(seconds=self.config['time_window'])
 
         ip_stats = defaultdict(lambda: {
             'count': 0,
             'score': 0,
             'signatures': set(),
-            'timestamps': []
+            'timestamps': [],
+            'context': None
         })
 
         for alert in alerts:
@@ -307,15 +442,19 @@ class SecurityAgent:
             ip_stats[ip]['score'] += weight
             ip_stats[ip]['signatures'].add(sig)
             ip_stats[ip]['timestamps'].append(ts)
+            if ip_stats[ip]['context'] is None:
+                ip_stats[ip]['context'] = self._extract_context(alert)
 
         for ip, stats in ip_stats.items():
+            stats['score'] += self._context_bonus(stats['context'])
             if stats['count'] >= self.config['alert_threshold']:
                 threats.append({
                     'ip': ip,
                     'reason': f"High alert count ({stats['count']})",
                     'score': stats['score'],
                     'count': stats['count'],
-                    'signatures': list(stats['signatures'])[:3]
+                    'signatures': list(stats['signatures'])[:3],
+                    'context': stats['context']
                 })
             elif stats['score'] >= 20:
                 threats.append({
@@ -323,7 +462,8 @@ class SecurityAgent:
                     'reason': f"High risk score ({stats['score']})",
                     'score': stats['score'],
                     'count': stats['count'],
-                    'signatures': list(stats['signatures'])[:3]
+                    'signatures': list(stats['signatures'])[:3],
+                    'context': stats['context']
                 })
             elif len(stats['signatures']) >= 3:
                 threats.append({
@@ -331,12 +471,106 @@ class SecurityAgent:
                     'reason': f"Multiple attack signatures ({len(stats['signatures'])})",
                     'score': stats['score'],
                     'count': stats['count'],
-                    'signatures': list(stats['signatures'])[:3]
+                    'signatures': list(stats['signatures'])[:3],
+                    'context': stats['context']
                 })
 
         threats.sort(key=lambda x: x['score'], reverse=True)
         return threats
 
+    def prepare_batch(self, alerts):
+        """알림 목록 → AlertBatch (numpy 필요). 같은 알림으로 설정을 바꿔 가며 평가할 때 재사용"""
+        return AlertBatch(self, alerts)
+
+    def _detect_threats_batch(self, batch, now):
+        """detect_threats의 NumPy 버전 (결과/순서 동일)"""
+        import numpy as np
+
+        window_start = now - timedelta(seconds=self.config['time_window'])
+        n_ips = len(batch.ips)
+        excluded = np.zeros(n_ips, dtype=bool)
+        for i, ip in enumerate(batch.ips):
+            if not ip or ip in self.config['whitelist']:
+                excluded[i] = True
+
+        # 1) 시간 창 + 화이트리스트 필터
+        rows = np.flatnonzero((batch.epoch_us >= (window_start - EPOCH) // _US) & ~excluded[batch.ip_codes])
+        if not len(rows):
+            return []
+        codes = batch.ip_codes[rows]
+        sev_codes = batch.severity_codes[rows]
+
+        # 2) IP 코드별 group-by (건수, 가중 점수, 서로 다른 signature 수, 첫 등장 행)
+        counts = np.bincount(codes, minlength=n_ips)
+        weights = [self.config['severity_weight'].get(int(s), 1) for s in batch.severity_values.tolist()]
+        # bincount는 행 순서대로 누적 → 기존 루프와 같은 순서로 더해짐
+        scores = np.bincount(codes, weights=np.array(weights, dtype=np.float64)[sev_codes], minlength=n_ips)
+        # 기존 루프처럼 float 가중치가 한 번이라도 더해진 IP만 float 점수
+        is_float = np.array([type(w) is not int for w in weights])
+        float_score = np.bincount(codes, weights=is_float[sev_codes], minlength=n_ips) > 0
+
+        n_sigs = len(batch.signatures)
+        pair_keys = codes * n_sigs + batch.sig_codes[rows]
+        # np.unique 대신 정렬 + 인접 비교 (numpy 2.3+의 해시 기반 unique는 이 경우 수십 배 느림)
+        sorted_keys = np.sort(pair_keys)
+        distinct_keys = sorted_keys[np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1]))]
+        distinct_sigs = np.bincount(distinct_keys // n_sigs, minlength=n_ips)
+
+        first_row = np.full(n_ips, len(batch), dtype=np.int64)
+        np.minimum.at(first_row, codes, rows)
+
+        # 3) 판정: 가산점이 없으면 벡터 조건으로 후보만 추리고, 있으면 창 안의 전체 IP를 Python으로 판정
+        if self.config['reputation_weight'] or self.config['country_weight'] or self.config['asn_weight']:
+            candidates = np.flatnonzero(counts)
+        else:
+            candidates = np.flatnonzero((counts >= self.config['alert_threshold'])
+                                        | (scores >= 20) | (distinct_sigs >= 3))
+        # 기존 루프의 dict 순서 = 시간 창 안에서 IP가 처음 등장한 순서
+        candidates = candidates[np.argsort(first_row[candidates])]
+
+        found = []
+        for g, count, score, is_f, n_sig, first in zip(
+                candidates.tolist(), counts[candidates].tolist(), scores[candidates].tolist(),
+                float_score[candidates].tolist(), distinct_sigs[candidates].tolist(),
+                first_row[candidates].tolist()):
+            score = score if is_f else int(score)
+            context = self._extract_context(batch.alerts[first])
+            score += self._context_bonus(context)
+            if count >= self.config['alert_threshold']:
+                reason = f"High alert count ({count})"
+            elif score >= 20:
+                reason = f"High risk score ({score})"
+            elif n_sig >= 3:
+                reason = f"Multiple attack signatures ({n_sig})"
+            else:
+                continue
+            found.append((g, reason, score, count, context))
+        if not found:
+            return []
+
+        # 4) 위협 IP의 signature를 첫 등장 순으로 → set에 같은 순서로 넣으면 기존 루프의 set과 순회 순서도 같음
+        is_threat = np.zeros(n_ips, dtype=bool)
+        is_threat[[f[0] for f in found]] = True
+        sel = is_threat[codes]
+        pairs, pair_first = np.unique(pair_keys[sel], return_index=True)
+        pair_ip = pairs // n_sigs
+        order = np.lexsort((pair_first, pair_ip))
+        sig_names = [batch.signatures[c] for c in (pairs[order] % n_sigs).tolist()]
+        bounds = np.searchsorted(pair_ip[order], [f[0] for f in found])
+        ends = np.searchsorted(pair_ip[order], [f[0] for f in found], side='right')
+
+        threats = [{
+            'ip': batch.ips[g],
+            'reason': reason,
+            'score': score,
+            'count': count,
+            'signatures': list(set(sig_names[b:e]))[:3],
+            'context': context
+        } for (g, reason, score, count, context), b, e in zip(found, bounds.tolist(), ends.tolist())]
+
+        threats.sort(key=lambda x: x['score'], reverse=True)
+        return threats
+
     def respond_to_threats(self, threats):
         for threat in threats:
             ip = threat['ip']
@@ -350,6 +584,9 @@ class SecurityAgent:
             print(f'      Score: {threat["score"]}')
             print(f'      Count: {threat["count"]}')
             print(f'      Signatures: {", ".join(threat["signatures"])}')
+            ctx = threat.get('context') or {}
+            if any(v is not None for v in ctx.values()):
+                print(f'      Context: country={ctx.get("country")} asn={ctx.get("asn")} reputation={ctx.get("reputation")}')
 
             if self.config['auto_block']:
                 print(f'      🔒 Auto blocking...')
@@ -357,13 +594,24 @@ class SecurityAgent:
 
                 if isinstance(result, str) and ('Success' in result or 'blocked' in result.lower()):
                     print(f'      ✅ Blocked successfully')
-                    self.blocked_ips.add(ip)
+                    self._remember_blocked(ip)
                     self.log_action('BLOCK', ip, threat)
                 else:
                     print(f'      ❌ Block failed: {result}')
             else:
                 print(f'      ℹ️  Auto-block disabled (manual action required)')
 
+    def _remember_blocked(self, ip):
+        """차단 IP 기록 (실제 iptables 규칙과 일치해야 하므로 예산을 넘어도 제거하지 않고 경고만)"""
+        if ip in self.blocked_ips:
+            return
+        self.blocked_ips[ip] = time.time()
+        self.memory.charge('blocked_ips', approx_size(ip))
+        if self.memory.over_budget() and not self._budget_warned:
+            self._budget_warned = True
+            print(f'   ⚠️  memory_budget exceeded by blocked IP records '
+                  f'({self.memory.used()} > {self.memory.budget} bytes), records are kept')
+
     def log_action(self, action, ip, details):
         log_entry = {
             'timestamp': datetime.now().isoformat(),
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Alert Ring - 공유 메모리 알림 링 버퍼
+- MCP 서버(단일 writer)가 최근 알림을 고정 크기 슬롯 링에 기록
+- 로컬 reader는 MCP 요청 없이 세그먼트를 직접 매핑해서 읽음
+- seqlock으로 reader가 쓰기 도중의 슬롯을 읽지 않도록 보호
+
+레이아웃:
+  header (64B): magic, version, slot_size, slot_count, seq, written
+  slot[i]     : u32 length + JSON bytes (slot_size 바이트 고정)
+"""
+
+import json
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional
+
+MAGIC = b"SRNG"
+VERSION = 1
+HEADER = struct.Struct("<4sIIIQQ")
+HEADER_SIZE = 64
+LEN = struct.Struct("<I")
+SEQ_OFFSET = 16      # magic(4) + version(4) + slot_size(4) + slot_count(4)
+WRITTEN_OFFSET = 24
+
+DEFAULT_SLOT_COUNT = 1000
+DEFAULT_SLOT_SIZE = 1024
+
+
+def _encode(alert: dict, limit: int) -> bytes:
+    """슬롯에 맞도록 직렬화 (넘치면 signature를 잘라냄)"""
+    data = json.dumps(alert, separators=(",", ":")).encode("utf-8")
+    if len(data) <= limit:
+        return data
+    trimmed = dict(alert)
+    sig = str(trimmed.get("signature", ""))
+    overflow = len(data) - limit
+    trimmed["signature"] = sig[: max(0, len(sig) - overflow - 3)] + "..."
+    data = json.dumps(trimmed, separators=(",", ":")).encode("utf-8")
+    return data if len(data) <= limit else b""
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """reader 측 attach: resource_tracker가 종료 시 세그먼트를 unlink하지 않도록 해제"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+
+class AlertRing:
+    """공유 메모리 알림 링 (writer)"""
+
+    def __init__(self, name: str,
+                 slot_count: int = DEFAULT_SLOT_COUNT,
+                 slot_size: int = DEFAULT_SLOT_SIZE):
+        self.name = name
+        self.slot_count = max(1, slot_count)
+        self.slot_size = max(LEN.size + 64, slot_size)
+        size = HEADER_SIZE + self.slot_count * self.slot_size
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # 이전 실행이 남긴 세그먼트 정리 후 재생성
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self._buf = self._shm.buf
+        self._seq = 0
+        self._written = 0
+        HEADER.pack_into(self._buf, 0, MAGIC, VERSION, self.slot_size, self.slot_count, 0, 0)
+
+    def append(self, alert: dict):
+        data = _encode(alert, self.slot_size - LEN.size)
+        if not data:
+            return
+        off = HEADER_SIZE + (self._written % self.slot_count) * self.slot_size
+        # seq 홀수 = 쓰기 중
+        self._seq += 1
+        struct.pack_into("<Q", self._buf, SEQ_OFFSET, self._seq)
+        LEN.pack_into(self._buf, off, len(data))
+        self._buf[off + LEN.size: off + LEN.size + len(data)] = data
+        self._written += 1
+        struct.pack_into("<Q", self._buf, WRITTEN_OFFSET, self._written)
+        self._seq += 1
+        struct.pack_into("<Q", self._buf, SEQ_OFFSET, self._seq)
+
+    def close(self, unlink: bool = True):
+        self._buf = None
+        try:
+            self._shm.close()
+            if unlink:
+                self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class AlertRingReader:
+    """공유 메모리 알림 링 (reader) - MCP 왕복 없이 최근 알림 조회"""
+
+    def __init__(self, name: str):
+        self._shm = _attach(name)
+        self._buf = self._shm.buf
+        magic, version, self.slot_size, self.slot_count, _, _ = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Not an alert ring segment: {name}")
+
+    def _header(self):
+        return struct.unpack_from("<QQ", self._buf, SEQ_OFFSET)
+
+    def read(self, count: Optional[int] = None, retries: int = 10) -> list[dict]:
+        """최근 count개 알림 (오래된 것 → 최신 순)"""
+        for _ in range(retries):
+            seq, written = self._header()
+            if seq & 1:
+                time.sleep(0)
+                continue
+            n = min(written, self.slot_count)
+            if count is not None:
+                n = min(n, max(0, count))
+            raw = []
+            for i in range(written - n, written):
+                off = HEADER_SIZE + (i % self.slot_count) * self.slot_size
+                (length,) = LEN.unpack_from(self._buf, off)
+                raw.append(self._buf[off + LEN.size: off + LEN.size + length])
+            # 읽는 도중 덮어쓰였다면 재시도 (memoryview이므로 디코드 전에 확인)
+            if self._header()[0] != seq:
+                continue
+            out = []
+            for mv in raw:
+                try:
+                    out.append(json.loads(bytes(mv)))
+                except ValueError:
+                    pass
+            # 디코드 중 덮어쓰기 여부 최종 확인
+            if self._header()[0] == seq:
+                return out
+        return []
+
+    def close(self):
+        self._buf = None
+        self._shm.close()
+
+
+def read_alerts(name: str, count: Optional[int] = None) -> list[dict]:
+    """편의 함수: 세그먼트에 붙어서 최근 알림을 읽고 분리"""
+    reader = AlertRingReader(name)
+    try:
+        return reader.read(count)
+    finally:
+        reader.close()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+detect_threats benchmark - 기존 루프 vs NumPy 배치 경로
+- 먼저 다양한 형식의 알림(타임스탬프 형식/키 이름/화이트리스트/문자열 severity 등)으로
+  두 경로의 결과가 완전히 같은지 확인 (다르면 AssertionError)
+- 이후 배치 크기별로 측정
+  prepare_s        : 알림 목록 → AlertBatch 변환 (1회)
+  evaluate_s       : 변환된 배치를 임계값만 바꿔 평가 (설정 1개당)
+  scalar_s         : 기존 dict 루프 (설정 1개당)
+  backtest_total_s : --backtests 개 설정을 평가하는 총 시간
+
+사용법:
+  python3 bench/bench_detect.py --sizes 1000000 10000000
+  python3 bench/bench_detect.py --sizes 1000000 --check-only
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "agent"))
+from mcp_agent import SecurityAgent  # noqa: E402
+
+NOW = datetime(2026, 1, 2, 0, 0, 0, tzinfo=timezone.utc)
+DAY = 86400
+
+
+def make_agent(**overrides) -> SecurityAgent:
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = SecurityAgent()
+    agent.config.update({
+        'time_window': DAY,
+        'alert_threshold': 5,
+        'severity_weight': {1: 10, 2: 5, 3: 2},
+        'whitelist': ['127.0.0.1', 'localhost', '10.0.0.1'],
+        'reputation_weight': 0, 'country_weight': {}, 'asn_weight': {},
+    })
+    agent.config.update(overrides)
+    return agent
+
+
+def fmt_ts(t: datetime, style: int) -> object:
+    """여러 타임스탬프 형식 (빠른 경로 + _parse_ts fallback 경로 모두)"""
+    if style == 0:
+        return t.strftime("%Y-%m-%dT%H:%M:%S.%f+0000")              # Suricata
+    if style == 1:
+        return t.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    if style == 2:
+        return t.astimezone(timezone(timedelta(hours=9))).isoformat()  # +09:00
+    if style == 3:
+        return t.strftime("%Y-%m-%dT%H:%M:%SZ")
+    if style == 4:
+        return t.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"         # 3자리 소수 → fallback
+    if style == 5:
+        return t.strftime("%Y-%m-%d %H:%M:%S+00:00")                  # 공백 구분 → fallback
+    if style == 6:
+        return t.astimezone(timezone(timedelta(hours=-5, minutes=-30))).strftime("%Y-%m-%dT%H:%M:%S%z")
+    return random.choice(["", None, "2026-02-30T00:00:00Z", "garbage", "2026-01-01T24:00:00Z"])
+
+
+def make_alert(rng: random.Random, n_ips: int, varied: bool) -> dict:
+    t = NOW - timedelta(seconds=rng.uniform(0, DAY * 1.2), microseconds=rng.randrange(1_000_000))
+    # 소수 IP가 대부분의 알림을 만드는 분포
+    k = int(n_ips * rng.random() ** 4)
+    ip = f"203.{k // 65536 % 256}.{k // 256 % 256}.{k % 256}"
+    sev = rng.choice((1, 2, 3, 3, 3))
+    sig = f"ET SCAN signature {rng.randrange(40)}"
+    if not varied:
+        return {"timestamp": fmt_ts(t, 0), "source_ip": ip, "severity": sev, "signature": sig}
+
+    alert = {"timestamp": fmt_ts(t, rng.choice((0, 0, 0, 1, 2, 3, 4, 5, 6, 7)))}
+    if rng.random() < 0.02:
+        del alert["timestamp"]
+    r = rng.random()
+    if r < 0.6:
+        alert["source_ip"] = ip
+    elif r < 0.9:
+        alert["src_ip"] = ip
+    elif r < 0.95:
+        alert["source_ip"] = rng.choice(("127.0.0.1", "10.0.0.1", ""))
+    if rng.random() < 0.7:
+        alert["severity"] = sev if rng.random() < 0.9 else str(sev)
+        alert["signature"] = sig
+    else:
+        alert["alert"] = {"severity": sev, "signature": sig} if rng.random() < 0.8 else {}
+    if rng.random() < 0.5:
+        alert["src_reputation"] = rng.choice((None, 10, 60, 95))
+        alert["src_country"] = rng.choice((None, "KR", "RU", "US"))
+        alert["src_asn"] = rng.choice((None, 4766, 12389))
+    return alert
+
+
+def check_equivalence():
+    rng = random.Random(42)
+    alerts = [make_alert(rng, 400, varied=True) for _ in range(50_000)]
+    configs = [
+        {},
+        {'severity_weight': {1: 7.5, 2: 2.25, 3: 0.1}},
+        {'severity_weight': {1: 7.5, 2: 5}, 'alert_threshold': 1000},
+        {'time_window': 3600, 'alert_threshold': 50},
+        {'whitelist': []},
+        {'reputation_weight': 20, 'country_weight': {'RU': 3}, 'asn_weight': {'12389': 1.5}},
+    ]
+    batch = make_agent().prepare_batch(alerts)
+    for overrides in configs:
+        agent = make_agent(**overrides)
+        expected = agent.detect_threats(alerts, now=NOW)
+        for got in (agent.detect_threats(agent.prepare_batch(alerts), now=NOW),
+                    agent.detect_threats(batch, now=NOW)):
+            # == 는 1 == 1.0 을 같다고 보므로 직렬화 결과(타입/순서 포함)로도 비교
+            assert got == expected, f"batch result differs for {overrides}"
+            assert json.dumps(got) == json.dumps(expected), f"batch result differs for {overrides}"
+        print(f"equivalent: {len(expected)} threats, config={overrides or 'default'}")
+
+
+def bench(size: int, scalar_max: int, backtests: int):
+    rng = random.Random(size)
+    pool = [make_alert(rng, 5_000_000, varied=False) for _ in range(min(size, 500_000))]
+    # 메모리 절약: 풀의 dict를 참조로 반복
+    alerts = [pool[rng.randrange(len(pool))] for _ in range(size)]
+    agent = make_agent()
+    result = {"alerts": size}
+
+    t0 = time.perf_counter()
+    batch = agent.prepare_batch(alerts)
+    result["prepare_s"] = round(time.perf_counter() - t0, 2)
+
+    # 백테스트: 같은 배치를 임계값만 바꿔 반복 평가
+    thresholds = [5 + k for k in range(backtests)]
+    batch_threats = []
+    t0 = time.perf_counter()
+    for threshold in thresholds:
+        agent.config['alert_threshold'] = threshold
+        batch_threats.append(agent.detect_threats(batch, now=NOW))
+    result["evaluate_s"] = round((time.perf_counter() - t0) / backtests, 3)
+    result["threats"] = len(batch_threats[0])
+
+    if size <= scalar_max:
+        t0 = time.perf_counter()
+        for threshold, expected in zip(thresholds, batch_threats):
+            agent.config['alert_threshold'] = threshold
+            assert agent.detect_threats(alerts, now=NOW) == expected
+        result["scalar_s"] = round((time.perf_counter() - t0) / backtests, 2)
+        result["backtest_total_s"] = {
+            "scalar": round(result["scalar_s"] * backtests, 1),
+            "batch": round(result["prepare_s"] + result["evaluate_s"] * backtests, 1),
+        }
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="detect_threats scalar vs batch benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--scalar-max", type=int, default=10_000_000, help="이 크기까지만 기존 루프도 측정")
+    parser.add_argument("--backtests", type=int, default=5, help="같은 배치를 임계값만 바꿔 평가하는 횟수")
+    parser.add_argument("--check-only", action="store_true")
+    args = parser.parse_args()
+
+    check_equivalence()
+    if args.check_only:
+        return
+    for size in args.sizes:
+        bench(size, args.scalar_max, args.backtests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Enrichment benchmark - 구간 인덱스 정확성 + 조회 비용
+- 먼저 겹치는/중첩된 구간(예: /8 안의 단일 IP)에서 IntervalIndex 결과가
+  "가장 좁은 구간 우선, 크기가 같으면 나중 행" 기준 전수 비교와 같은지 확인 (다르면 AssertionError)
+- 이후 CSV 3종(geo/asn/reputation)을 만들어 Enricher 캐시 hit/miss 조회 시간 측정
+
+사용법:
+  python3 bench/bench_enrich.py --rows 100000 --lookups 200000
+  python3 bench/bench_enrich.py --check-only
+"""
+
+import argparse
+import ipaddress
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from enrichment import Enricher, IntervalIndex  # noqa: E402
+
+
+def reference(rows: list[tuple[int, int, int, object]], version: int, n: int):
+    """전수 비교: n을 포함하는 구간 중 가장 좁은 것, 크기가 같으면 나중 행"""
+    best = None
+    for order, (v, start, end, value) in enumerate(rows):
+        if v == version and start <= n <= end:
+            key = (end - start, -order)
+            if best is None or key < best[0]:
+                best = (key, value)
+    return best[1] if best else None
+
+
+def check_index(rows, probes):
+    index = IntervalIndex()
+    for v, start, end, value in rows:
+        index.add(v, start, end, value)
+    index.build()
+    for addr in probes:
+        expected = reference(rows, addr.version, int(addr))
+        got = index.lookup(addr)
+        assert got == expected, f"{addr}: expected {expected!r}, got {got!r}"
+
+
+def net(cidr: str):
+    n = ipaddress.ip_network(cidr)
+    return n.version, int(n.network_address), int(n.broadcast_address)
+
+
+def check_overlaps():
+    # 리뷰에서 나온 경우: /8 안의 단일 IP
+    rows = [(*net("10.0.0.0/8"), 0), (*net("10.1.1.1/32"), 90)]
+    probes = [ipaddress.ip_address(a) for a in ("10.0.0.5", "10.1.1.1", "10.1.1.2", "10.200.0.1", "11.0.0.1")]
+    check_index(rows, probes)
+    print("equivalent: nested single IP in /8")
+
+    # 여러 단계 중첩 + 같은 구간 중복 + 부분 겹침 + IPv6
+    rows = [
+        (*net("10.0.0.0/8"), "a"), (*net("10.1.0.0/16"), "b"), (*net("10.1.1.0/24"), "c"),
+        (*net("10.1.1.0/24"), "c2"), (4, int(ipaddress.ip_address("10.1.0.200")), int(ipaddress.ip_address("10.2.0.10")), "d"),
+        (*net("2001:db8::/32"), "v6"), (*net("2001:db8::1/128"), "v6-host"),
+    ]
+    probes = [ipaddress.ip_address(a) for a in (
+        "10.0.0.1", "10.1.0.1", "10.1.0.200", "10.1.1.7", "10.1.2.0", "10.2.0.10", "10.2.0.11",
+        "10.255.255.255", "9.255.255.255", "2001:db8::1", "2001:db8::2", "2001:db9::1")]
+    check_index(rows, probes)
+    print("equivalent: multi-level nesting / duplicates / partial overlap / IPv6")
+
+    # 무작위 중첩 구간
+    rng = random.Random(7)
+    rows = []
+    for i in range(300):
+        prefix = rng.randrange(8, 33)
+        base = rng.randrange(2 ** 32) >> (32 - prefix) << (32 - prefix)
+        rows.append((4, base, base + 2 ** (32 - prefix) - 1, i))
+    probes = [ipaddress.ip_address(rng.choice((r[1], r[2], r[2] + 1, rng.randrange(2 ** 32))) % 2 ** 32)
+              for r in rows for _ in range(3)]
+    check_index(rows, probes)
+    print(f"equivalent: {len(rows)} random nested ranges, {len(probes)} probes")
+
+
+def write_csvs(workdir: Path, rows: int) -> dict:
+    step = 2 ** 32 // rows
+    paths = {}
+    for kind, make in (
+        ("geo", lambda i: rng.choice(("KR", "US", "RU", "CN", "DE"))),
+        ("asn", lambda i: f"AS{1000 + i % 5000},Org {i % 5000}"),
+        ("reputation", lambda i: f"{rng.randrange(101)},scanner"),
+    ):
+        rng = random.Random(kind)
+        paths[kind] = workdir / f"{kind}.csv"
+        with open(paths[kind], "w") as f:
+            for i in range(rows):
+                start = i * step
+                f.write(f"{ipaddress.ip_address(start)},{ipaddress.ip_address(start + step - 1)},{make(i)}\n")
+    return paths
+
+
+def bench(rows: int, lookups: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_csvs(Path(tmp), rows)
+        t0 = time.perf_counter()
+        enricher = Enricher(str(paths["geo"]), str(paths["asn"]), str(paths["reputation"]),
+                            cache_size=lookups, cache_ttl=3600)
+        load_s = time.perf_counter() - t0
+
+    rng = random.Random(1)
+    ips = [str(ipaddress.ip_address(rng.randrange(2 ** 32))) for _ in range(lookups)]
+    t0 = time.perf_counter()
+    for ip in ips:
+        enricher.lookup(ip)
+    miss_us = (time.perf_counter() - t0) / lookups * 1e6
+    t0 = time.perf_counter()
+    for ip in ips:
+        enricher.lookup(ip)
+    hit_us = (time.perf_counter() - t0) / lookups * 1e6
+    print(json.dumps({"rows_per_db": rows, "load_s": round(load_s, 2),
+                      "miss_us": round(miss_us, 2), "hit_us": round(hit_us, 2)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IntervalIndex check + enrichment lookup benchmark")
+    parser.add_argument("--rows", type=int, default=100_000, help="DB 1개당 구간 수")
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--check-only", action="store_true")
+    args = parser.parse_args()
+
+    check_overlaps()
+    if args.check_only:
+        return
+    bench(args.rows, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark - MCP 서버 cold start 시간
+- 프로세스 시작 → 첫 initialize 응답
+- 프로세스 시작 → 첫 tools/call(get_alert_stats) 결과
+- --backfill N: N라인짜리 eve.json을 만들어 EVE_BACKFILL=N으로 백필 비용 포함
+
+사용법:
+  python3 bench/bench_startup.py --runs 10 --backfill 5000
+  python3 bench/bench_startup.py --server /path/to/old/mcp_suricata_server.py   # 이전 버전과 비교
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_transport import SERVER, LineClient, make_alert
+
+
+def run_once(server: str, env: dict) -> tuple[float, float]:
+    t0 = time.perf_counter()
+    p = subprocess.Popen([sys.executable, server], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                         stderr=subprocess.DEVNULL, text=True, bufsize=1, env=env)
+    try:
+        client = LineClient(p.stdout, p.stdin)
+        client.initialize()
+        t_init = time.perf_counter() - t0
+        client.request("tools/call", {"name": "get_alert_stats", "arguments": {}})
+        t_tool = time.perf_counter() - t0
+    finally:
+        p.stdin.close()
+        p.terminate()
+        p.wait(timeout=10)
+    return t_init * 1000, t_tool * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP server cold start benchmark")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--backfill", type=int, default=50, help="eve.json 라인 수 (= EVE_BACKFILL)")
+    parser.add_argument("--server", default=str(SERVER))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        eve = Path(tmp) / "eve.json"
+        with open(eve, "w") as f:
+            for i in range(args.backfill):
+                f.write(make_alert(i) + "\n")
+        env = dict(os.environ, EVE_LOG=str(eve), EVE_BACKFILL=str(args.backfill))
+        env.pop("MCP_SOCKET", None)
+
+        run_once(args.server, env)  # 워밍업 (디스크 캐시/.pyc)
+        inits, tools = [], []
+        for _ in range(args.runs):
+            t_init, t_tool = run_once(args.server, env)
+            inits.append(t_init)
+            tools.append(t_tool)
+
+    print(json.dumps({
+        "server": args.server,
+        "backfill": args.backfill,
+        "runs": args.runs,
+        "initialize_p50_ms": round(statistics.median(inits), 1),
+        "initialize_max_ms": round(max(inits), 1),
+        "first_tool_p50_ms": round(statistics.median(tools), 1),
+        "first_tool_max_ms": round(max(tools), 1),
+    }))
+
+
+if __name__ == "__main__":
+    main()
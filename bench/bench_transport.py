@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Transport benchmark - stdio(소비자마다 서버) vs Unix socket 데몬(서버 1개 공유)
+- 임시 eve.json에 일정 속도로 alert를 append
+- 서버 프로세스 CPU 시간(/proc/<pid>/stat)과 get_recent_alerts 왕복 지연을 측정
+- --shm 지정 시 공유 메모리 링 직접 읽기 지연도 측정
+
+사용법:
+  python3 bench/bench_transport.py --consumers 2 --rate 500 --duration 5
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SERVER = ROOT / "mcp_suricata_server.py"
+sys.path.insert(0, str(ROOT))
+
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+
+
+def cpu_seconds(pid: int) -> float:
+    """utime + stime (초)"""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / CLK_TCK
+
+
+class LineClient:
+    """줄 단위 JSON-RPC 클라이언트 (stdio 파이프/소켓 공용)"""
+
+    def __init__(self, rfile, wfile):
+        self.rfile = rfile
+        self.wfile = wfile
+        self.next_id = 0
+
+    def send(self, msg: dict):
+        self.wfile.write(json.dumps(msg) + "\n")
+        self.wfile.flush()
+
+    def request(self, method: str, params: dict | None = None) -> dict:
+        self.next_id += 1
+        rid = self.next_id
+        self.send({"jsonrpc": "2.0", "id": rid, "method": method, "params": params or {}})
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                raise ConnectionError("server closed")
+            msg = json.loads(line)
+            if msg.get("id") == rid:
+                return msg
+
+    def initialize(self):
+        self.request("initialize", {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {},
+            "clientInfo": {"name": "bench", "version": "1.0.0"},
+        })
+        self.send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+
+
+def make_alert(i: int) -> str:
+    return json.dumps({
+        "timestamp": "2026-01-01T00:00:00.000000+0000",
+        "event_type": "alert",
+        "src_ip": f"10.0.{(i >> 8) & 255}.{i & 255}",
+        "dest_ip": "192.168.0.10",
+        "src_port": 40000 + i % 1000,
+        "dest_port": 80,
+        "proto": "TCP",
+        "alert": {"signature": f"BENCH signature {i % 50}", "category": "bench", "severity": 1 + i % 3},
+    })
+
+
+def write_alerts(eve: Path, rate: int, duration: float, stop: threading.Event):
+    interval = 0.05
+    per_tick = max(1, int(rate * interval))
+    i = 0
+    end = time.monotonic() + duration
+    with open(eve, "a") as f:
+        while time.monotonic() < end and not stop.is_set():
+            f.write("".join(make_alert(i + k) + "\n" for k in range(per_tick)))
+            f.flush()
+            i += per_tick
+            time.sleep(interval)
+
+
+def wait_for(path: Path, timeout: float = 10.0):
+    end = time.monotonic() + timeout
+    while not path.exists():
+        if time.monotonic() > end:
+            raise TimeoutError(f"{path} not created")
+        time.sleep(0.05)
+
+
+def measure_latency(client: LineClient, calls: int, samples: list):
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        client.request("tools/call", {"name": "get_recent_alerts", "arguments": {"count": 100}})
+        samples.append((time.perf_counter() - t0) * 1000)
+
+
+def run(mode: str, args, workdir: Path) -> dict:
+    eve = workdir / f"eve_{mode}.json"
+    eve.write_text("")
+    env = dict(os.environ, EVE_LOG=str(eve))
+    env.pop("MCP_SOCKET", None)
+    procs, clients = [], []
+
+    if mode == "stdio":
+        for _ in range(args.consumers):
+            p = subprocess.Popen([sys.executable, str(SERVER)], stdin=subprocess.PIPE,
+                                 stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                 text=True, bufsize=1, env=env)
+            procs.append(p)
+            clients.append(LineClient(p.stdout, p.stdin))
+    else:
+        sock_path = workdir / "mcp.sock"
+        cmd = [sys.executable, str(SERVER), "--socket", str(sock_path)]
+        if args.shm:
+            cmd += ["--shm", args.shm]
+        p = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                             stderr=subprocess.DEVNULL, env=env)
+        procs.append(p)
+        wait_for(sock_path)
+        for _ in range(args.consumers):
+            s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            s.connect(str(sock_path))
+            clients.append(LineClient(s.makefile("r"), s.makefile("w")))
+
+    for c in clients:
+        c.initialize()
+
+    cpu0 = sum(cpu_seconds(p.pid) for p in procs)
+    stop = threading.Event()
+    writer = threading.Thread(target=write_alerts, args=(eve, args.rate, args.duration, stop))
+    writer.start()
+
+    samples: list[float] = []
+    readers = [threading.Thread(target=measure_latency, args=(c, args.calls, samples)) for c in clients]
+    for t in readers:
+        t.start()
+    for t in readers:
+        t.join()
+    writer.join()
+    time.sleep(0.5)  # tail 마무리
+    cpu1 = sum(cpu_seconds(p.pid) for p in procs)
+
+    shm_samples: list[float] = []
+    if mode == "socket" and args.shm:
+        from alert_ring import AlertRingReader
+        reader = AlertRingReader(args.shm)
+        for _ in range(args.calls):
+            t0 = time.perf_counter()
+            reader.read(100)
+            shm_samples.append((time.perf_counter() - t0) * 1000)
+        reader.close()
+
+    for p in procs:
+        p.terminate()
+    for p in procs:
+        p.wait(timeout=5)
+
+    result = {
+        "mode": mode,
+        "servers": len(procs),
+        "consumers": args.consumers,
+        "server_cpu_s": round(cpu1 - cpu0, 3),
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(statistics.quantiles(samples, n=20)[18], 3),
+    }
+    if shm_samples:
+        result["shm_p50_ms"] = round(statistics.median(shm_samples), 3)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="stdio vs Unix socket transport benchmark")
+    parser.add_argument("--consumers", type=int, default=2)
+    parser.add_argument("--rate", type=int, default=500, help="eve.json에 쓰는 alert/초")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--calls", type=int, default=200, help="소비자당 get_recent_alerts 호출 수")
+    parser.add_argument("--shm", default="suricata_bench_ring")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("stdio", "socket"):
+            print(json.dumps(run(mode, args, Path(tmp))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+IP Enrichment - 출발지 IP의 국가/ASN/로컬 평판 조회 (로컬 파일만 사용)
+- CSV 범위 파일 → 정렬된 구간 인덱스(bisect)로 조회
+- MaxMind 형식 .mmdb는 maxminddb 패키지가 있을 때만 사용 (선택 의존성, geo/asn만. 평판은 CSV만)
+- 조회 결과는 TTL이 있는 LRU 캐시에 보관 → 반복 IP는 dict 조회 한 번
+
+CSV 형식 (헤더/빈 줄/# 주석 무시):
+  geo        : start_ip,end_ip,country        또는  cidr,country
+  asn        : start_ip,end_ip,asn[,org]      또는  cidr,asn[,org]
+  reputation : start_ip,end_ip,score[,label]  또는  ip_or_cidr,score[,label]   (score 0~100)
+겹치는 구간(예: /8 안의 단일 IP)은 더 좁은 구간의 값이 우선
+"""
+
+import bisect
+import csv
+import heapq
+import ipaddress
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from memory_budget import MemoryBudget, approx_size
+
+# 알림에 붙는 필드 (조회 실패 시 None)
+FIELDS = ("src_country", "src_asn", "src_as_org", "src_reputation", "src_reputation_label")
+
+
+def log(*args, **kwargs):
+    print(*args, file=sys.stderr, **kwargs)
+
+
+def _parse_range(fields: list[str]) -> Optional[tuple[int, int, int, list[str]]]:
+    """행 앞부분을 (ip 버전, 시작, 끝, 나머지 필드)로 해석. IP가 아니면 None (헤더 등)"""
+    try:
+        if "/" in fields[0] or len(fields) < 2:
+            net = ipaddress.ip_network(fields[0].strip(), strict=False)
+            return net.version, int(net.network_address), int(net.broadcast_address), fields[1:]
+        start = ipaddress.ip_address(fields[0].strip())
+        try:
+            end = ipaddress.ip_address(fields[1].strip())
+        except ValueError:
+            # 단일 IP + 값
+            return start.version, int(start), int(start), fields[1:]
+        if start.version != end.version:
+            return None
+        return start.version, int(start), int(end), fields[2:]
+    except ValueError:
+        return None
+
+
+def _disjoint(rows: list[tuple[int, int, Any]]) -> list[tuple[int, int, Any]]:
+    """겹치는 구간 → 서로소 구간 (겹친 부분은 더 좁은 구간, 크기가 같으면 나중 행의 값)
+
+    예: 10.0.0.0/8=0 + 10.1.1.1=90 → 10.0.0.0~10.1.1.0=0, 10.1.1.1=90, 10.1.1.2~10.255.255.255=0
+    """
+    order = sorted(range(len(rows)), key=lambda i: rows[i][0])
+    points = sorted({r[0] for r in rows} | {r[1] + 1 for r in rows})
+    active: list[tuple[int, int, int, Any]] = []  # (구간 크기, -행 번호, 끝, 값) 최소 힙
+    out: list[list] = []
+    k = 0
+    for p, next_p in zip(points, points[1:]):
+        while k < len(order) and rows[order[k]][0] <= p:
+            start, end, value = rows[order[k]]
+            heapq.heappush(active, (end - start, -order[k], end, value))
+            k += 1
+        while active and active[0][2] < p:
+            heapq.heappop(active)  # 끝난 구간 (최상위만 보므로 지연 삭제로 충분)
+        if not active:
+            continue
+        _, row, _, value = active[0]
+        if out and out[-1][3] == row and out[-1][1] == p - 1:
+            out[-1][1] = next_p - 1
+        else:
+            out.append([p, next_p - 1, value, row])
+    return [(start, end, value) for start, end, value, _ in out]
+
+
+class IntervalIndex:
+    """IP 구간 → 값. 시작 주소 정렬 배열에서 bisect로 O(log n) 조회
+    (겹치는 구간은 build()에서 서로소 구간으로 나눔, 더 좁은 구간 우선)"""
+
+    def __init__(self):
+        self._rows: dict[int, list[tuple[int, int, Any]]] = {4: [], 6: []}
+        self._starts: dict[int, list[int]] = {4: [], 6: []}
+        self._ends: dict[int, list[int]] = {4: [], 6: []}
+        self._values: dict[int, list[Any]] = {4: [], 6: []}
+        self.overlapping = False
+
+    def add(self, version: int, start: int, end: int, value: Any):
+        self._rows[version].append((start, end, value))
+
+    def build(self):
+        for v, rows in self._rows.items():
+            ordered = sorted(rows, key=lambda r: r[0])
+            if any(cur[0] <= prev[1] for prev, cur in zip(ordered, ordered[1:])):
+                self.overlapping = True
+                ordered = _disjoint(rows)
+            self._starts[v] = [r[0] for r in ordered]
+            self._ends[v] = [r[1] for r in ordered]
+            self._values[v] = [r[2] for r in ordered]
+        self._rows = {4: [], 6: []}
+        return self
+
+    def __len__(self):
+        return len(self._starts[4]) + len(self._starts[6])
+
+    def lookup(self, addr) -> Any:
+        v, n = addr.version, int(addr)
+        i = bisect.bisect_right(self._starts[v], n) - 1
+        if i >= 0 and n <= self._ends[v][i]:
+            return self._values[v][i]
+        return None
+
+    def approx_bytes(self) -> int:
+        return sum(approx_size(self._starts[v]) + approx_size(self._ends[v]) + approx_size(self._values[v])
+                   for v in (4, 6))
+
+    @classmethod
+    def from_csv(cls, path: Path, parse_value: Callable[[list[str]], Any]) -> "IntervalIndex":
+        index = cls()
+        with open(path, newline="", encoding="utf-8", errors="ignore") as f:
+            for fields in csv.reader(f):
+                if not fields or fields[0].lstrip().startswith("#"):
+                    continue
+                parsed = _parse_range(fields)
+                if parsed is None:
+                    continue
+                version, start, end, rest = parsed
+                try:
+                    value = parse_value(rest)
+                except (IndexError, ValueError):
+                    continue
+                index.add(version, start, end, value)
+        index.build()
+        if index.overlapping:
+            log(f"[MCP] {path}: overlapping ranges, more specific ranges take precedence")
+        return index
+
+
+class MMDBSource:
+    """MaxMind 형식 DB (GeoLite2-Country/ASN 등). maxminddb 패키지 필요"""
+
+    def __init__(self, path: Path, extract: Callable[[dict], Any]):
+        import maxminddb  # 선택 의존성
+        self._reader = maxminddb.open_database(str(path))
+        self._extract = extract
+
+    def lookup(self, addr) -> Any:
+        record = self._reader.get(str(addr))
+        return self._extract(record) if record else None
+
+    def approx_bytes(self) -> int:
+        return 0  # mmap된 파일, 파이썬 힙 사용 없음
+
+
+def _geo_from_csv(rest):
+    return rest[0].strip().upper() or None
+
+
+def _geo_from_mmdb(record):
+    country = record.get("country") or record.get("registered_country") or {}
+    return country.get("iso_code")
+
+
+def parse_asn(value) -> int:
+    """'AS4766', 'as4766', '4766', 4766 → 4766 (숫자가 아니면 ValueError)"""
+    return int(str(value).strip().upper().removeprefix("AS"))
+
+
+def _asn_from_csv(rest):
+    return parse_asn(rest[0]), (rest[1].strip() if len(rest) > 1 else None)
+
+
+def _asn_from_mmdb(record):
+    asn = record.get("autonomous_system_number")
+    return (int(asn), record.get("autonomous_system_organization")) if asn else None
+
+
+def _reputation_from_csv(rest):
+    score = max(0, min(100, int(float(rest[0]))))
+    return score, (rest[1].strip() if len(rest) > 1 else None)
+
+
+def _load_source(path: Optional[str], csv_parser, mmdb_extract: Optional[Callable[[dict], Any]]):
+    if not path:
+        return None
+    p = Path(path)
+    if not p.exists():
+        log(f"[MCP] enrichment source not found: {p}")
+        return None
+    try:
+        if p.suffix.lower() == ".mmdb":
+            if mmdb_extract is None:
+                log(f"[MCP] {p}: .mmdb is not supported for this source (CSV only), skipping")
+                return None
+            return MMDBSource(p, mmdb_extract)
+        return IntervalIndex.from_csv(p, csv_parser)
+    except ImportError:
+        log(f"[MCP] maxminddb not installed, skipping {p} (pip3 install maxminddb)")
+    except Exception as e:
+        log(f"[MCP] failed to load {p}: {e}")
+    return None
+
+
+class TTLCache:
+    """LRU + TTL 캐시 (OrderedDict, 단일 스레드용)"""
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 3600.0):
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[dict]:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires, value = item
+        if expires < time.monotonic():
+            # 만료 항목은 다음 put에서 교체됨
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: dict) -> list[tuple[str, dict]]:
+        """저장 후 교체/LRU로 밀려난 (key, value) 목록 반환"""
+        removed = []
+        old = self._data.pop(key, None)
+        if old is not None:
+            removed.append((key, old[1]))
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        if len(self._data) > self.maxsize:
+            old_key, (_, old_value) = self._data.popitem(last=False)
+            removed.append((old_key, old_value))
+        return removed
+
+
+class Enricher:
+    """src_ip → 국가/ASN/평판 조회 (캐시 경유)"""
+
+    def __init__(self, geo: Optional[str] = None, asn: Optional[str] = None,
+                 reputation: Optional[str] = None,
+                 cache_size: int = 10000, cache_ttl: float = 3600.0,
+                 memory: Optional[MemoryBudget] = None):
+        self.geo = _load_source(geo, _geo_from_csv, _geo_from_mmdb)
+        self.asn = _load_source(asn, _asn_from_csv, _asn_from_mmdb)
+        self.reputation = _load_source(reputation, _reputation_from_csv, None)  # 평판은 CSV만
+        self.cache = TTLCache(cache_size, cache_ttl)
+        self.memory = memory or MemoryBudget()
+        self.memory.charge("enrichment_index", sum(s.approx_bytes() for s in self.sources()),
+                           items=sum(len(s) for s in self.sources() if isinstance(s, IntervalIndex)))
+
+    def sources(self) -> list:
+        return [s for s in (self.geo, self.asn, self.reputation) if s is not None]
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sources())
+
+    def lookup(self, ip: str) -> dict:
+        cached = self.cache.get(ip)
+        if cached is not None:
+            return cached
+        result = dict.fromkeys(FIELDS)
+        try:
+            self._fill(result, ipaddress.ip_address(ip))
+        except ValueError:
+            pass  # 빈 값/잘못된 IP → 필드 모두 None
+        self.memory.charge("enrichment_cache", approx_size(ip) + approx_size(result))
+        for key, value in self.cache.put(ip, result):
+            self.memory.release("enrichment_cache", approx_size(key) + approx_size(value), evicted=True)
+        return result
+
+    def _fill(self, result: dict, addr):
+        if self.geo is not None:
+            result["src_country"] = self.geo.lookup(addr)
+        if self.asn is not None:
+            asn = self.asn.lookup(addr)
+            if asn:
+                result["src_asn"], result["src_as_org"] = asn
+        if self.reputation is not None:
+            rep = self.reputation.lookup(addr)
+            if rep:
+                result["src_reputation"], result["src_reputation_label"] = rep
+
+    def stats(self) -> dict:
+        total = self.cache.hits + self.cache.misses
+        return {
+            "cache_entries": len(self.cache),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "hit_rate": round(self.cache.hits / total, 3) if total else None,
+        }
@@ -1,20 +1,43 @@
 // mcp-client.js
 import { spawn } from 'child_process';
 import { EventEmitter } from 'events';
+import { existsSync } from 'fs';
+import net from 'net';
 
 export class MCPClient extends EventEmitter {
-  constructor(serverScript = './mcp_suricata_server.py') {
+  constructor(serverScript = './mcp_suricata_server.py', socketPath = process.env.MCP_SOCKET) {
     super();
     this.serverScript = serverScript;
+    // 데몬 모드 서버의 Unix socket (없으면 자식 프로세스 방식)
+    this.socketPath = socketPath;
     this.process = null;
+    this.socket = null;
     this.requestId = 0;
     this.pendingRequests = new Map();
     this.buffer = '';
   }
 
   async connect() {
+    if (this.socketPath && existsSync(this.socketPath)) {
+      try {
+        return await this.connectSocket();
+      } catch (error) {
+        // 데몬이 SIGKILL/OOM으로 죽으면 소켓 파일만 남음 → 자식 프로세스 방식으로 대체
+        if (error.code !== 'ECONNREFUSED' && error.code !== 'ENOENT') throw error;
+        console.warn(`[MCP Client] Socket ${this.socketPath} unavailable (${error.code}), starting own server`);
+        this.socket.destroy();
+        this.socket = null;
+        this.buffer = '';
+      }
+    }
+    return this.spawnServer();
+  }
+
+  async spawnServer() {
     return new Promise((resolve, reject) => {
-      this.process = spawn('python3', [this.serverScript]);
+      // 자식 서버는 stdio 전용 (MCP_SOCKET을 물려받으면 소켓 데몬 모드로 떠 버림)
+      const { MCP_SOCKET, ...env } = process.env;
+      this.process = spawn('python3', [this.serverScript], { env });
       
       this.process.stdout.on('data', (data) => {
         this.buffer += data.toString();
@@ -35,24 +58,61 @@ export class MCPClient extends EventEmitter {
         this.emit('disconnect');
       });
 
-      // 초기화 메시지 전송
-      this.sendRequest('initialize', {
-        protocolVersion: '2024-11-05',
-        capabilities: {
-          roots: { listChanged: true },
-          sampling: {}
-        },
-        clientInfo: {
-          name: 'suricata-dashboard',
-          version: '1.0.0'
-        }
-      }).then(() => {
-        console.log('[MCP Client] Connected to server');
-        resolve();
-      }).catch(reject);
+      this.initialize().then(resolve).catch(reject);
     });
   }
 
+  async connectSocket() {
+    return new Promise((resolve, reject) => {
+      this.socket = net.createConnection(this.socketPath);
+
+      this.socket.on('connect', () => {
+        // 연결된 뒤에만 disconnect 이벤트 (연결 실패 시에는 connect()가 stdio로 대체)
+        this.socket.on('close', () => {
+          console.log(`[MCP Server] Socket closed (${this.socketPath})`);
+          this.emit('disconnect');
+        });
+        this.initialize().then(resolve).catch(reject);
+      });
+
+      this.socket.on('data', (data) => {
+        this.buffer += data.toString();
+        this.processBuffer();
+      });
+
+      this.socket.on('error', (error) => {
+        console.error('[MCP Socket Error]', error.message);
+        reject(error);
+      });
+    });
+  }
+
+  async initialize() {
+    // 초기화 메시지 전송
+    await this.sendRequest('initialize', {
+      protocolVersion: '2024-11-05',
+      capabilities: {
+        roots: { listChanged: true },
+        sampling: {}
+      },
+      clientInfo: {
+        name: 'suricata-dashboard',
+        version: '1.0.0'
+      }
+    });
+    this.write({ jsonrpc: '2.0', method: 'notifications/initialized' });
+    console.log('[MCP Client] Connected to server');
+  }
+
+  write(message) {
+    const line = JSON.stringify(message) + '\n';
+    if (this.socket) {
+      this.socket.write(line);
+    } else {
+      this.process.stdin.write(line);
+    }
+  }
+
   processBuffer() {
     const lines = this.buffer.split('\n');
     this.buffer = lines.pop() || '';
@@ -97,8 +157,7 @@ export class MCPClient extends EventEmitter {
 
       this.pendingRequests.set(id, { resolve, reject });
       
-      const message = JSON.stringify(request) + '\n';
-      this.process.stdin.write(message);
+      this.write(request);
 
       // 타임아웃 설정
       setTimeout(() => {
@@ -120,6 +179,10 @@ export class MCPClient extends EventEmitter {
       name,
       arguments: args
     });
+    // 잘못된 인자 등 도구 오류(isError)는 JSON 결과가 아니라 오류 문구 → 예외로 전달
+    if (result?.isError) {
+      throw new Error(result.content?.[0]?.text || `${name} failed`);
+    }
     return result;
   }
 
@@ -135,18 +198,28 @@ export class MCPClient extends EventEmitter {
     return content ? JSON.parse(content) : {};
   }
 
-  async searchAlerts(query) {
-    const result = await this.callTool('search_alerts', { query });
+  async searchAlerts(query, filters = {}) {
+    const result = await this.callTool('search_alerts', { query, ...filters });
     const content = result.content?.[0]?.text;
     return content ? JSON.parse(content) : { results: 0, alerts: [] };
   }
 
+  async getMemoryUsage() {
+    const result = await this.callTool('get_memory_usage', {});
+    const content = result.content?.[0]?.text;
+    return content ? JSON.parse(content) : {};
+  }
+
   async blockIP(ip, reason = 'Security threat') {
     const result = await this.callTool('block_ip', { ip, reason });
     return result.content?.[0]?.text || 'Unknown result';
   }
 
   disconnect() {
+    if (this.socket) {
+      this.socket.end();
+      this.socket = null;
+    }
     if (this.process) {
       this.process.kill();
       this.process = null;
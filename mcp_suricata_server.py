@@ -1,30 +1,111 @@
 #!/usr/bin/env python3
 """
-Suricata MCP Server - MCP 표준 프로토콜 (stdio)
+Suricata MCP Server - MCP 표준 프로토콜 (stdio / Unix socket)
 - eve.json tail (권한/파일회전 대응)
 - stdout은 JSON-RPC 통신 전용, 모든 로그는 stderr로만 출력
+- --socket 지정 시 단일 데몬으로 동작: 여러 클라이언트가 같은 alert_history 공유
+- --shm 지정 시 알림 링을 공유 메모리로 게시 (alert_ring.AlertRingReader로 읽기)
+- MCP SDK는 지연 로딩: initialize는 SDK 로딩/백필 완료 전에 즉시 응답
+- --memory-budget 지정 시 알림 저장소 등 근사 메모리 사용량을 예산 이하로 유지
+- --geo-db/--asn-db/--reputation-db 지정 시 src_ip에 국가/ASN/평판 필드 추가 (enrichment.py)
 """
 
+from __future__ import annotations
+
 import os
 import sys
+import argparse
 import asyncio
 import json
 import io
+import signal
+import threading
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Optional
-from mcp.server.models import InitializationOptions
-from mcp.server import NotificationOptions, Server
-from mcp.server.stdio import stdio_server
-from mcp.types import Resource, Tool, TextContent, ImageContent, EmbeddedResource
+from typing import TYPE_CHECKING, Any, Optional
+
+from memory_budget import LOW_WATER, POLICIES, POLICY_OLDEST, MemoryBudget, approx_size, parse_size
+
+if TYPE_CHECKING:
+    from mcp.types import Resource, Tool, TextContent, ImageContent, EmbeddedResource
 
 # ------------------ 전역 상태 ------------------
 alert_history: list[dict] = []
 blocked_ips: set[str] = set()
+# 공유 메모리 알림 링 (--shm 지정 시에만 생성)
+alert_ring = None
+# 알림 보존 개수 / 근사 메모리 예산 (main()에서 인자로 설정)
+max_alerts = 1000
+memory = MemoryBudget()
+# src_ip 국가/ASN/평판 조회기 (enrichment DB 지정 시에만 생성)
+enricher = None
+# 알림 eviction으로는 줄지 않는 메모리 집계 카테고리
+FIXED_CATEGORIES = ("shm_ring", "enrichment_index", "blocked_ips")
 
 # ------------------ 유틸: 안전 로깅 ------------------
 def log(*args, **kwargs):
     print(*args, file=sys.stderr, **kwargs)
 
+# ------------------ 알림 저장 ------------------
+def record_alert(info: dict):
+    alert_history.append(info)
+    memory.charge("alerts", approx_size(info))
+    # 메모리 보호: 최근 max_alerts개 + 메모리 예산 이하로 유지
+    if len(alert_history) > max_alerts or memory.over_budget():
+        evict_alerts()
+    if alert_ring is not None:
+        alert_ring.append(info)
+
+def enrich_alert(info: dict):
+    if enricher is not None:
+        info.update(enricher.lookup(info.get("src_ip", "")))
+
+def _severity(alert: dict) -> int:
+    try:
+        return int(alert.get("severity", 3))
+    except (TypeError, ValueError):
+        return 3
+
+def evict_alerts():
+    """max_alerts/메모리 예산을 넘긴 만큼 eviction policy에 따라 알림 제거
+
+    알림이 가진 바이트 이상은 비우려 하지 않고, 방금 추가된 최신 알림은 항상 남김
+    (고정 사용량만으로 예산을 넘는 경우는 check_memory_budget()이 시작 시 경고)
+    """
+    need_bytes = min(memory.excess(), memory.used("alerts"))
+    newest = len(alert_history) - 1
+    if memory.policy == POLICY_OLDEST:
+        # 개수 제한은 기존과 동일하게 정확히 max_alerts개 유지
+        need_count = len(alert_history) - max_alerts
+        order = range(newest)
+    else:
+        # 정렬 비용이 있으므로 LOW_WATER까지 한 번에 비움
+        need_count = len(alert_history) - int(max_alerts * LOW_WATER) if len(alert_history) > max_alerts else 0
+        order = sorted(range(newest), key=lambda i: (-_severity(alert_history[i]), i))
+
+    drop = []
+    freed = 0
+    for i in order:
+        if len(drop) >= need_count and freed >= need_bytes:
+            break
+        drop.append(i)
+        freed += approx_size(alert_history[i])
+
+    if memory.policy == POLICY_OLDEST:
+        del alert_history[: len(drop)]
+    else:
+        dropped = set(drop)
+        alert_history[:] = [a for i, a in enumerate(alert_history) if i not in dropped]
+    memory.release("alerts", freed, items=len(drop), evicted=True)
+
+def check_memory_budget():
+    """eviction으로 줄일 수 없는 사용량(공유 메모리 링, enrichment 인덱스, 차단 IP)만으로 예산을 넘으면 경고"""
+    fixed = sum(memory.used(c) for c in FIXED_CATEGORIES)
+    if memory.budget and fixed >= memory.budget:
+        log(f"[MCP] WARNING: memory budget {memory.budget} bytes is below fixed usage {fixed} bytes "
+            f"({', '.join(f'{c}={memory.used(c)}' for c in FIXED_CATEGORIES if memory.used(c))}); "
+            f"only the newest alert will be kept. Raise --memory-budget or drop --shm/enrichment DBs.")
+
 # ------------------ Suricata 모니터 ------------------
 class SuricataMonitor:
     """Suricata eve.json tail 모니터링 (회전/권한/백필 대응)"""
@@ -72,25 +153,13 @@ class SuricataMonitor:
 
         if initial:
             if self.backfill_lines > 0:
-                # 최근 N 라인 백필
+                # 최근 N 라인 백필 (파일 읽기는 스레드에서, 파싱은 청크 단위로 양보하며)
                 try:
-                    self._fd.seek(0, 2)
-                    size = self._fd.tell()
-                    block = 4096
-                    chunks = []
-                    read = 0
-                    while size > 0 and len(chunks) < 1024:
-                        step = min(block, size)
-                        size -= step
-                        self._fd.seek(size)
-                        data = self._fd.read(step)
-                        chunks.append(data)
-                        if data.count("\n") >= self.backfill_lines:
-                            break
-                    buf = "".join(reversed(chunks))
-                    lines = buf.splitlines()[-self.backfill_lines:]
-                    for line in lines:
-                        self._consume_line(line)
+                    lines = await asyncio.to_thread(self._read_tail_lines)
+                    for i in range(0, len(lines), 200):
+                        for line in lines[i:i + 200]:
+                            self._consume_line(line)
+                        await asyncio.sleep(0)
                 except Exception as e:
                     log(f"[MCP] backfill failed: {e}")
                 # 이후 끝으로
@@ -99,6 +168,24 @@ class SuricataMonitor:
                 # 끝으로 이동 (tail -f)
                 self._fd.seek(0, 2)
 
+    def _read_tail_lines(self) -> list[str]:
+        self._fd.seek(0, 2)
+        size = self._fd.tell()
+        block = 4096
+        chunks = []
+        lines_seen = 0
+        while size > 0 and len(chunks) < 1024:
+            step = min(block, size)
+            size -= step
+            self._fd.seek(size)
+            data = self._fd.read(step)
+            chunks.append(data)
+            lines_seen += data.count("\n")
+            if lines_seen > self.backfill_lines:
+                break
+        buf = "".join(reversed(chunks))
+        return buf.splitlines()[-self.backfill_lines:]
+
     async def _reopen_if_rotated(self):
         if not self._fd:
             await self._open_file()
@@ -167,20 +254,29 @@ class SuricataMonitor:
             "dest_port": event.get("dest_port", 0),
         }
 
-        alert_history.append(info)
-        # 메모리 보호: 최근 1000개만 유지
-        if len(alert_history) > 1000:
-            del alert_history[: len(alert_history) - 1000]
+        # 출발지 IP 컨텍스트 (국가/ASN/평판, 캐시 경유)
+        enrich_alert(info)
+        record_alert(info)
 
 # ------------------ MCP 서버 ------------------
-server = Server("suricata-mcp-server")
+SERVER_NAME = "suricata-mcp-server"
+SERVER_VERSION = "1.1.0"
+
+# MCP SDK는 import만 수백 ms~수 초(소형 센서 장비)가 걸리므로 load_sdk()에서 지연 로딩
+server = None
+stdio_server = None
+InitializationOptions = None
+NotificationOptions = None
+sdk_task: Optional[asyncio.Task] = None
+
 # 경로는 환경변수 EVE_LOG 로 재정의 가능
 eve_path = os.environ.get("EVE_LOG", "/var/log/suricata/eve.json")
-# 시작 시 최근 50라인 백필(원치 않으면 0)
-monitor = SuricataMonitor(eve_log_path=eve_path, backfill_lines=50)
+# 시작 시 최근 N라인 백필(기본 50, 원치 않으면 EVE_BACKFILL=0)
+monitor = SuricataMonitor(eve_log_path=eve_path,
+                          backfill_lines=int(os.environ.get("EVE_BACKFILL", "50")))
 
-@server.list_resources()
 async def handle_list_resources() -> list[Resource]:
+    from mcp.types import Resource
     return [
         Resource(
             uri="suricata://alerts",
@@ -196,7 +292,6 @@ async def handle_list_resources() -> list[Resource]:
         ),
     ]
 
-@server.read_resource()
 async def handle_read_resource(uri: str) -> str:
     if uri == "suricata://alerts":
         return json.dumps({"total": len(alert_history), "alerts": alert_history[-50:]}, indent=2)
@@ -204,8 +299,8 @@ async def handle_read_resource(uri: str) -> str:
         return json.dumps({"total": len(blocked_ips), "ips": list(blocked_ips)}, indent=2)
     raise ValueError(f"Unknown resource: {uri}")
 
-@server.list_tools()
 async def handle_list_tools() -> list[Tool]:
+    from mcp.types import Tool
     return [
         Tool(
             name="get_recent_alerts",
@@ -237,13 +332,22 @@ async def handle_list_tools() -> list[Tool]:
         ),
         Tool(
             name="search_alerts",
-            description="Search alerts by IP address or signature",
+            description="Search alerts by IP address or signature, optionally filtered by source country/ASN/reputation",
             inputSchema={
                 "type": "object",
-                "properties": {"query": {"type": "string"}},
-                "required": ["query"],
+                "properties": {
+                    "query": {"type": "string", "default": ""},
+                    "country": {"type": "string", "description": "ISO country code of the source IP"},
+                    "asn": {"type": ["number", "string"], "description": "AS number, e.g. 4766 or \"AS4766\""},
+                    "min_reputation": {"type": "number", "minimum": 0, "maximum": 100},
+                },
             },
         ),
+        Tool(
+            name="get_memory_usage",
+            description="Get approximate memory usage against the configured budget",
+            inputSchema={"type": "object", "properties": {}},
+        ),
         Tool(  # 통신/파이프라인 점검용
             name="inject_test_alert",
             description="Inject a synthetic alert into memory for testing",
@@ -258,8 +362,8 @@ async def handle_list_tools() -> list[Tool]:
         ),
     ]
 
-@server.call_tool()
 async def handle_call_tool(name: str, arguments: dict | None) -> list[TextContent | ImageContent | EmbeddedResource]:
+    from mcp.types import TextContent
     args = arguments or {}
 
     if name == "get_recent_alerts":
@@ -280,12 +384,18 @@ async def handle_call_tool(name: str, arguments: dict | None) -> list[TextConten
             raise ValueError("IP address required")
         reason = args.get("reason", "Security threat")
         is_ipv6 = ":" in ip
-        cmd = ["sudo", "ip6tables" if is_ipv6 else "iptables", "-A", "INPUT", "-s", ip, "-j", "DROP"]
+        rule = ["INPUT", "-s", ip, "-j", "DROP"]
+        tool = ["sudo", "ip6tables" if is_ipv6 else "iptables"]
         try:
             import subprocess
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            # 같은 규칙이 이미 있으면(-C 성공) 다시 추가하지 않음 → 재탐지 시 중복 DROP 규칙 방지
+            result = subprocess.run(tool + ["-C"] + rule, capture_output=True, text=True)
+            if result.returncode != 0:
+                result = subprocess.run(tool + ["-A"] + rule, capture_output=True, text=True)
             if result.returncode == 0:
-                blocked_ips.add(ip)
+                if ip not in blocked_ips:
+                    blocked_ips.add(ip)
+                    memory.charge("blocked_ips", approx_size(ip))
                 return [TextContent(type="text", text=f"Successfully blocked {ip}. Reason: {reason}")]
             return [TextContent(type="text", text=f"Failed to block {ip}: {result.stderr}")]
         except Exception as e:
@@ -312,19 +422,43 @@ async def handle_call_tool(name: str, arguments: dict | None) -> list[TextConten
 
     if name == "search_alerts":
         q = str(args.get("query", "")).lower()
+        country = str(args["country"]).upper() if args.get("country") else None
+        try:
+            from enrichment import parse_asn
+            asn = parse_asn(args["asn"]) if args.get("asn") is not None else None
+        except ValueError:
+            raise ValueError(f"Invalid asn: {args['asn']!r} (expected a number like 4766 or AS4766)")
+        try:
+            min_rep = float(args["min_reputation"]) if args.get("min_reputation") is not None else None
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid min_reputation: {args['min_reputation']!r} (expected 0-100)")
         results = []
         for a in alert_history:
+            if country is not None and a.get("src_country") != country:
+                continue
+            if asn is not None and a.get("src_asn") != asn:
+                continue
+            if min_rep is not None and (a.get("src_reputation") or 0) < min_rep:
+                continue
             if q in (a.get("source_ip", "") or "").lower() \
                or q in (a.get("dest_ip", "") or "").lower() \
                or q in (a.get("signature", "") or "").lower():
                 results.append(a)
         return [TextContent(type="text", text=json.dumps({"query": q, "results": len(results), "alerts": results[-20:]}, indent=2))]
 
+    if name == "get_memory_usage":
+        usage = memory.snapshot()
+        usage["max_alerts"] = max_alerts
+        usage["alerts"] = len(alert_history)
+        if enricher is not None:
+            usage["enrichment"] = enricher.stats()
+        return [TextContent(type="text", text=json.dumps(usage, indent=2))]
+
     if name == "inject_test_alert":
         ip = args.get("ip", "10.10.10.10")
         sig = args.get("signature", "TEST ICMP Ping detected")
         sev = int(args.get("severity", 3))
-        alert_history.append({
+        info = {
             "timestamp": "2099-01-01T00:00:00Z",
             "protocol": "ICMP",
             "category": "Test",
@@ -332,31 +466,311 @@ async def handle_call_tool(name: str, arguments: dict | None) -> list[TextConten
             "signature": sig,
             "src_ip": ip, "dest_ip": "1.1.1.1", "src_port": 0, "dest_port": 0,
             "source_ip": ip, "dest_ip": "1.1.1.1", "source_port": 0, "dest_port": 0,
-        })
+        }
+        enrich_alert(info)
+        record_alert(info)
         return [TextContent(type="text", text="Injected one synthetic alert")]
 
     raise ValueError(f"Unknown tool: {name}")
 
+def load_sdk():
+    """MCP SDK import + 핸들러 등록 (워커 스레드에서 실행)"""
+    global server, stdio_server, InitializationOptions, NotificationOptions
+    import mcp.server
+    import mcp.server.models
+    import mcp.server.stdio
+
+    srv = mcp.server.Server(SERVER_NAME)
+    srv.list_resources()(handle_list_resources)
+    srv.read_resource()(handle_read_resource)
+    srv.list_tools()(handle_list_tools)
+    srv.call_tool()(handle_call_tool)
+
+    InitializationOptions = mcp.server.models.InitializationOptions
+    NotificationOptions = mcp.server.NotificationOptions
+    stdio_server = mcp.server.stdio.stdio_server
+    server = srv
+
+# ------------------ initialize 즉시 응답 ------------------
+# SDK 없이 응답 내용을 확신할 수 있는 프로토콜 버전 (그 외 버전은 SDK가 직접 응답)
+_FAST_INIT_VERSIONS = ("2024-11-05", "2025-03-26", "2025-06-18")
+
+def _fast_initialize_reply(line: str) -> Optional[tuple[Any, str]]:
+    """첫 줄이 initialize 요청이면 (id, 응답 JSON) 반환"""
+    try:
+        msg = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(msg, dict) or msg.get("method") != "initialize" or "id" not in msg:
+        return None
+    version = (msg.get("params") or {}).get("protocolVersion")
+    if version not in _FAST_INIT_VERSIONS:
+        return None
+    result = {
+        "protocolVersion": version,
+        "capabilities": {
+            "experimental": {},
+            "resources": {"subscribe": False, "listChanged": False},
+            "tools": {"listChanged": False},
+        },
+        "serverInfo": {"name": SERVER_NAME, "version": SERVER_VERSION},
+    }
+    return msg["id"], json.dumps({"jsonrpc": "2.0", "id": msg["id"], "result": result}, separators=(",", ":"))
+
+# ------------------ 줄 단위 전송 (stdio / Unix socket) ------------------
+class _LineReader(ABC):
+    """stdio_server가 기대하는 줄 단위 async iterator (하위 클래스는 readline만 구현)"""
+
+    @abstractmethod
+    async def readline(self) -> str:
+        """다음 줄 (EOF면 빈 문자열)"""
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        line = await self.readline()
+        if not line:
+            raise StopAsyncIteration
+        return line
+
+
+class _SocketLineReader(_LineReader):
+    def __init__(self, reader: asyncio.StreamReader):
+        self._reader = reader
+
+    async def readline(self) -> str:
+        line = await self._reader.readline()
+        return line.decode("utf-8", errors="replace")
+
+
+class _StdinLineReader(_LineReader):
+    """stdin을 데몬 스레드에서 읽어 이벤트 루프로 전달 (SDK의 fd 처리 없이 동작)"""
+
+    def __init__(self):
+        loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue[bytes] = asyncio.Queue()
+
+        # sys.stdin과 별도 버퍼 사용: 종료 시 데몬 스레드가 sys.stdin 락을 잡고 있으면 abort
+        stdin = open(sys.stdin.fileno(), "rb", closefd=False)
+
+        def pump():
+            try:
+                for line in stdin:
+                    loop.call_soon_threadsafe(self._queue.put_nowait, line)
+                loop.call_soon_threadsafe(self._queue.put_nowait, b"")
+            except RuntimeError:
+                pass  # 이벤트 루프 종료
+
+        threading.Thread(target=pump, daemon=True).start()
+
+    async def readline(self) -> str:
+        line = await self._queue.get()
+        return line.decode("utf-8", errors="replace")
+
+
+class _ReplayLineReader(_LineReader):
+    """이미 읽은 첫 줄을 먼저 돌려준 뒤 원래 reader로 이어감"""
+
+    def __init__(self, first: str, reader: _LineReader):
+        self._first: Optional[str] = first
+        self._reader = reader
+
+    async def readline(self) -> str:
+        if self._first is not None:
+            line, self._first = self._first, None
+            return line
+        return await self._reader.readline()
+
+
+class _SocketLineWriter:
+    """asyncio StreamWriter → stdio_server가 기대하는 write/flush"""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self._writer = writer
+
+    async def write(self, data: str):
+        self._writer.write(data.encode("utf-8"))
+
+    async def flush(self):
+        await self._writer.drain()
+
+
+class _StdoutLineWriter:
+    async def write(self, data: str):
+        await asyncio.to_thread(sys.stdout.buffer.write, data.encode("utf-8"))
+
+    async def flush(self):
+        await asyncio.to_thread(sys.stdout.buffer.flush)
+
+
+class _SkipResponseWriter:
+    """즉시 응답으로 이미 보낸 initialize 결과를 SDK가 중복 전송하지 않도록 한 번 걸러냄"""
+
+    def __init__(self, writer, skip_id: Any):
+        self._writer = writer
+        self._skip_id = skip_id
+        self._skipping = True
+
+    async def write(self, data: str):
+        if self._skipping:
+            try:
+                msg = json.loads(data)
+            except ValueError:
+                msg = None
+            if isinstance(msg, dict) and msg.get("id") == self._skip_id and "method" not in msg:
+                self._skipping = False
+                return
+        await self._writer.write(data)
+
+    async def flush(self):
+        await self._writer.flush()
+
+
+def _init_options() -> InitializationOptions:
+    return InitializationOptions(
+        server_name=SERVER_NAME,
+        server_version=SERVER_VERSION,
+        capabilities=server.get_capabilities(
+            notification_options=NotificationOptions(),
+            experimental_capabilities={},
+        ),
+    )
+
+
+async def serve_session(reader: _LineReader, writer):
+    """연결 하나(stdio 또는 socket)의 MCP 세션. SDK 로딩 전이라도 initialize는 즉시 응답"""
+    first = await reader.readline()
+    if not first:
+        return
+    fast = _fast_initialize_reply(first)
+    if fast is not None:
+        init_id, reply = fast
+        await writer.write(reply + "\n")
+        await writer.flush()
+        # SDK 세션 상태를 맞추기 위해 initialize는 SDK에도 그대로 전달하고 응답만 버림
+        writer = _SkipResponseWriter(writer, init_id)
+
+    await sdk_task
+    async with stdio_server(_ReplayLineReader(first, reader), writer) as (read_stream, write_stream):
+        await server.run(read_stream, write_stream, _init_options())
+
+
+async def _serve_socket_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    # 연결마다 독립된 MCP 세션, 상태(alert_history/blocked_ips)는 공유
+    log("[MCP] Client connected (socket)")
+    try:
+        await serve_session(_SocketLineReader(reader), _SocketLineWriter(writer))
+    except (ConnectionError, BrokenPipeError):
+        pass
+    except Exception as e:
+        log(f"[MCP] Socket session error: {e}")
+    finally:
+        try:
+            writer.close()
+        except Exception:
+            pass
+        log("[MCP] Client disconnected (socket)")
+
+
+async def serve_socket(socket_path: str):
+    path = Path(socket_path)
+    # 이전 실행이 남긴 소켓 파일 정리
+    if path.exists() or path.is_symlink():
+        path.unlink()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    unix_server = await asyncio.start_unix_server(_serve_socket_client, path=str(path))
+    os.chmod(path, 0o660)
+    log(f"Suricata MCP Server started (socket: {path})")
+    try:
+        async with unix_server:
+            await unix_server.serve_forever()
+    finally:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
 # ------------------ 엔트리 ------------------
+async def _start_monitor(args):
+    global enricher
+    if args.geo_db or args.asn_db or args.reputation_db:
+        from enrichment import Enricher
+        loaded = await asyncio.to_thread(
+            Enricher, args.geo_db, args.asn_db, args.reputation_db,
+            args.enrich_cache_size, args.enrich_cache_ttl, memory)
+        if loaded.enabled:
+            enricher = loaded
+            log(f"[MCP] Enrichment enabled ({memory.used('enrichment_index')} bytes indexed)")
+    check_memory_budget()
+    await monitor.start()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Suricata MCP Server")
+    parser.add_argument("--socket", default=os.environ.get("MCP_SOCKET"),
+                        help="Unix domain socket 경로 (지정 시 다중 클라이언트 데몬 모드)")
+    parser.add_argument("--shm", default=os.environ.get("MCP_SHM"),
+                        help="알림 링을 게시할 공유 메모리 세그먼트 이름")
+    parser.add_argument("--max-alerts", type=int, default=int(os.environ.get("MCP_MAX_ALERTS", "1000")),
+                        help="보존할 최대 알림 개수")
+    parser.add_argument("--memory-budget", default=os.environ.get("MCP_MEMORY_BUDGET", "0"),
+                        help="근사 메모리 예산 (예: 64M, 0 = 무제한)")
+    parser.add_argument("--eviction", choices=POLICIES, default=os.environ.get("MCP_EVICTION", POLICY_OLDEST),
+                        help="예산/개수 초과 시 제거 정책")
+    parser.add_argument("--geo-db", default=os.environ.get("ENRICH_GEO_DB"),
+                        help="국가 DB (.mmdb 또는 CSV 범위 파일)")
+    parser.add_argument("--asn-db", default=os.environ.get("ENRICH_ASN_DB"),
+                        help="ASN DB (.mmdb 또는 CSV 범위 파일)")
+    parser.add_argument("--reputation-db", default=os.environ.get("ENRICH_REPUTATION_DB"),
+                        help="로컬 평판 CSV (ip/cidr/범위, score 0~100, label)")
+    parser.add_argument("--enrich-cache-size", type=int, default=int(os.environ.get("ENRICH_CACHE_SIZE", "10000")))
+    parser.add_argument("--enrich-cache-ttl", type=float, default=float(os.environ.get("ENRICH_CACHE_TTL", "3600")),
+                        help="조회 결과 캐시 TTL (초)")
+    return parser.parse_args()
+
 async def main():
-    # Suricata 모니터 시작
-    monitor_task = asyncio.create_task(monitor.start())
+    global alert_ring, sdk_task, max_alerts, memory
+    args = parse_args()
+    max_alerts = max(1, args.max_alerts)
+    memory = MemoryBudget(parse_size(args.memory_budget), args.eviction)
+
+    # SDK 로딩은 백그라운드 스레드에서 (그 사이 initialize 응답/백필 진행)
+    sdk_task = asyncio.create_task(asyncio.to_thread(load_sdk))
+
+    if args.shm:
+        from alert_ring import AlertRing
+        alert_ring = AlertRing(args.shm)
+        memory.charge("shm_ring", alert_ring.slot_count * alert_ring.slot_size)
+        for a in alert_history:
+            alert_ring.append(a)
+        log(f"[MCP] Shared alert ring: /dev/shm/{args.shm}")
+
+    # Suricata 모니터 시작 (데몬 모드에서도 tail은 한 번만)
+    # enrichment DB 로딩(수십만 행 CSV 등)은 스레드에서, 끝난 뒤 백필/tail 시작
+    monitor_task = asyncio.create_task(_start_monitor(args))
+
+    # pkill(SIGTERM) 시에도 소켓/공유 메모리 정리
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except (NotImplementedError, RuntimeError):
+        pass
+
+    try:
+        if args.socket:
+            await serve_socket(args.socket)
+            return
 
-    # MCP 서버 실행 (stdio)
-    async with stdio_server() as (read_stream, write_stream):
+        # MCP 서버 실행 (stdio)
         log("Suricata MCP Server started (stdio)")
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="suricata-mcp-server",
-                server_version="1.1.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
-                ),
-            ),
-        )
+        await serve_session(_StdinLineReader(), _StdoutLineWriter())
+    finally:
+        monitor.running = False
+        monitor_task.cancel()
+        if alert_ring is not None:
+            alert_ring.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
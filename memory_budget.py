@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Memory Budget - 근사 메모리 사용량 집계 + 예산 초과 판단
+- 카테고리(alerts, blocked_ips, ...)별 바이트를 charge/release로 누적
+- 실제 제거(eviction)는 데이터를 가진 쪽(서버/에이전트)이 policy에 따라 수행
+- 수치는 sys.getsizeof 기반 근사값 (인터프리터 오버헤드/단편화 제외)
+"""
+
+import sys
+from typing import Optional
+
+# eviction 정책
+POLICY_OLDEST = "oldest"        # 오래된 것부터
+POLICY_SEVERITY = "severity"    # 낮은 심각도(숫자가 큰 것)부터, 같은 심각도 내에서는 오래된 것부터
+POLICIES = (POLICY_OLDEST, POLICY_SEVERITY)
+
+# 예산 초과 시 이 비율까지 내려서 매 건마다 eviction이 반복되지 않도록 함
+LOW_WATER = 0.95
+
+_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_size(value) -> int:
+    """'256M', '64MB', '1g', '1048576' → 바이트 (0/None = 무제한)"""
+    if value is None:
+        return 0
+    if isinstance(value, (int, float)):
+        return max(0, int(value))
+    s = str(value).strip().upper()
+    if s.endswith("B"):
+        s = s[:-1]
+    unit = s[-1:] if s[-1:] in _UNITS else ""
+    number = s[: len(s) - len(unit)] if unit else s
+    try:
+        return max(0, int(float(number) * _UNITS[unit]))
+    except ValueError:
+        raise ValueError(f"Invalid size: {value!r}")
+
+
+def approx_size(obj) -> int:
+    """컨테이너를 한 단계씩 따라가며 합산한 근사 크기 (바이트)"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        # 키는 대부분 리터럴(인터닝)이라 값만 합산
+        for v in obj.values():
+            size += approx_size(v)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for v in obj:
+            size += approx_size(v)
+    return size
+
+
+class MemoryBudget:
+    """카테고리별 근사 바이트 집계 + 예산 초과 판단"""
+
+    def __init__(self, budget_bytes: int = 0, policy: str = POLICY_OLDEST):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy} (choose from {', '.join(POLICIES)})")
+        self.budget = max(0, budget_bytes)
+        self.policy = policy
+        self._bytes: dict[str, int] = {}
+        self._items: dict[str, int] = {}
+        self.evictions: dict[str, int] = {}
+
+    def charge(self, category: str, nbytes: int, items: int = 1):
+        self._bytes[category] = self._bytes.get(category, 0) + nbytes
+        self._items[category] = self._items.get(category, 0) + items
+
+    def release(self, category: str, nbytes: int, items: int = 1, evicted: bool = False):
+        self._bytes[category] = max(0, self._bytes.get(category, 0) - nbytes)
+        self._items[category] = max(0, self._items.get(category, 0) - items)
+        if evicted:
+            self.evictions[category] = self.evictions.get(category, 0) + items
+
+    def used(self, category: Optional[str] = None) -> int:
+        if category is not None:
+            return self._bytes.get(category, 0)
+        return sum(self._bytes.values())
+
+    def over_budget(self) -> bool:
+        return self.budget > 0 and self.used() > self.budget
+
+    def excess(self) -> int:
+        """예산 아래(LOW_WATER)로 내려가기 위해 비워야 할 바이트"""
+        if not self.over_budget():
+            return 0
+        return self.used() - int(self.budget * LOW_WATER)
+
+    def snapshot(self) -> dict:
+        used = self.used()
+        return {
+            "budget_bytes": self.budget,
+            "used_bytes": used,
+            "used_percent": round(used * 100 / self.budget, 1) if self.budget else None,
+            "policy": self.policy,
+            "categories": {
+                c: {"bytes": b, "items": self._items.get(c, 0), "evicted": self.evictions.get(c, 0)}
+                for c, b in sorted(self._bytes.items())
+            },
+        }
@@ -226,14 +226,32 @@ app.post("/api/block-ip", async (req, res) => {
 // API: 알림 검색
 app.get("/api/search", async (req, res) => {
   try {
-    const query = req.query.q;
-    
-    if (!query) {
+    const query = req.query.q || '';
+    // 출발지 컨텍스트 필터 (서버 enrichment 사용 시)
+    const filters = {};
+    if (req.query.country) filters.country = req.query.country;
+    if (req.query.asn) {
+      // hosts 화면과 같은 "AS4766" 형식도 허용
+      const asn = String(req.query.asn).trim().toUpperCase().replace(/^AS/, '');
+      if (!/^\d+$/.test(asn)) {
+        return res.status(400).json({ success: false, error: 'Invalid asn (expected a number like 4766 or AS4766)' });
+      }
+      filters.asn = Number(asn);
+    }
+    if (req.query.min_reputation) {
+      const minRep = Number(req.query.min_reputation);
+      if (!Number.isFinite(minRep)) {
+        return res.status(400).json({ success: false, error: 'Invalid min_reputation (expected 0-100)' });
+      }
+      filters.min_reputation = minRep;
+    }
+
+    if (!query && Object.keys(filters).length === 0) {
       return res.status(400).json({ success: false, error: 'Query required' });
     }
 
     const client = await ensureMCPConnection();
-    const data = await client.searchAlerts(query);
+    const data = await client.searchAlerts(query, filters);
     
     const alerts = (data.alerts || []).map(a => ({
       id: `AL-${Date.parse(a.timestamp)}`,
@@ -245,7 +263,10 @@ app.get("/api/search", async (req, res) => {
       protocol: a.protocol,
       action: Math.random() > 0.3 ? 'BLOCK' : 'ALLOW',
       severity: ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL'][a.severity - 1] || 'MEDIUM',
-      rule: a.signature
+      rule: a.signature,
+      country: a.src_country,
+      asn: a.src_asn,
+      reputation: a.src_reputation
     }));
 
     res.json({ success: true, query, results: data.results, alerts });
@@ -308,7 +329,12 @@ app.get("/hosts", async (_req, res) => {
       if (!ip) return;
       
       if (!ipStats[ip]) {
-        ipStats[ip] = { ip, bytes: 0, blocked: 0, allowed: 0 };
+        ipStats[ip] = {
+          ip, bytes: 0, blocked: 0, allowed: 0,
+          country: a.src_country || '-',
+          asn: a.src_asn ? `AS${a.src_asn}` : '-',
+          reputation: a.src_reputation ?? '-'
+        };
       }
       
       ipStats[ip].bytes += Math.random() * 5; // 임시
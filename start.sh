@@ -502,6 +502,7 @@ if [ ! -f "agent/agent_config.json" ]; then
   "alert_threshold": 5,
   "time_window": 300,
   "auto_block": true,
+  "memory_budget": 0,
   "severity_weight": {
     "1": 10,
     "2": 5,
@@ -562,16 +563,18 @@ fi
 echo -e "${CYAN}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
 echo ""
 
-# MCP 서버 시작
+# MCP 서버 시작 (단일 데몬: Agent와 Dashboard가 Unix socket으로 공유)
+export MCP_SOCKET="${MCP_SOCKET:-$SCRIPT_DIR/logs/mcp_suricata.sock}"
 echo -e "${GREEN}[▶] MCP Server 시작 중...${NC}"
 if [ -f "mcp_suricata_server.py" ]; then
-    python3 mcp_suricata_server.py > logs/mcp_server.log 2>&1 &
+    python3 mcp_suricata_server.py --socket "$MCP_SOCKET" > logs/mcp_server.log 2>&1 &
     MCP_PID=$!
     echo -e "    PID: ${MCP_PID}"
     sleep 2
     
     if ps -p $MCP_PID > /dev/null; then
         echo -e "    ${GREEN}✓${NC} MCP Server 실행 중"
+        echo -e "    Socket: ${MCP_SOCKET}"
     else
         echo -e "    ${RED}✗${NC} MCP Server 시작 실패"
         echo -e "    로그: cat logs/mcp_server.log"